@@ -13,7 +13,8 @@ Example:
     $ python pdf_combiner.py
 Dependencies:
     - requests
-    - beautifulsoup4
+    - urllib3 >= 2.0
+    - selectolax
     - PyPDF2
     - logging
     - os
@@ -22,9 +23,12 @@ Dependencies:
     - dataclasses
     - re
     - urllib
+    - orjson
+    - concurrent.futures
+    - qpdf (optional, used for combining when installed)
 The application will:
 1. Fetch PDF links from the OMB memoranda page
-2. Download individual PDFs to a specified directory
+2. Download individual PDFs concurrently to a specified directory
 3. Combine all downloaded PDFs into a single document
 4. Save the combined PDF with a timestamp
 5. Log all operations to both console and file
@@ -32,23 +36,40 @@ Notes:
     - Requires write permissions in the specified download and output directories
     - Uses rotating file logs with 5MB size limit and 3 backup files
     - Handles both relative and absolute URLs
+    - Reuses pooled keep-alive connections for all HTTP requests
+    - Reuses unchanged local files without a network call until CACHE_MAX_AGE expires,
+      then revalidates them with conditional GETs (ETag/Last-Modified)
     - Implements error handling and logging for all major operations
 """
 import os
 from io import BytesIO
 from typing import List, Optional, Dict
-from urllib.parse import urlparse, urljoin
-from dataclasses import dataclass
+from urllib.parse import urlparse, urljoin, urldefrag
+from dataclasses import dataclass, field
 import logging
 from logging.handlers import RotatingFileHandler
 import re
+import hashlib
+from pathlib import Path
+import shutil
+import subprocess
 from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
+import orjson
+from selectolax.lexbor import LexborHTMLParser
 from PyPDF2 import PdfReader, PdfWriter
+from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError, RequestException
+from urllib3.util.retry import Retry
 from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import repeat
+from functools import lru_cache
+from contextlib import ExitStack
+from collections import Counter
 import time
+import threading
+import random
 
 def setup_application_logging(name: str, log_dir: str) -> logging.Logger:
     """Configure application-wide logging with file and console handlers."""
@@ -73,34 +94,78 @@ def setup_application_logging(name: str, log_dir: str) -> logging.Logger:
     file_handler = RotatingFileHandler(
         os.path.join(log_dir, f"{name}.log"),
         maxBytes=5*1024*1024,  # 5MB
-        backupCount=3
+        backupCount=3,
+        delay=True  # Don't open the log file until the first record is written
     )
     file_handler.setFormatter(formatter)
     logger.addHandler(file_handler)
     
     return logger
 
-@dataclass
+def _count_pages(filepath: str) -> int:
+    """Estimate PDF size by page count, avoiding full text extraction."""
+    with open(filepath, 'rb') as fh:
+        return len(PdfReader(fh, strict=False).pages)
+
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration."""
     BASE_URL: str = 'https://www.whitehouse.gov'
     MEMO_URL: str = 'https://www.whitehouse.gov/omb/information-for-agencies/memoranda/'
     A11_URL: str = 'https://www.whitehouse.gov/wp-content/uploads/2018/06/a11_web_toc.pdf'
-    DOWNLOAD_DIR: str = os.path.join(os.path.expanduser('~'), 'Downloads', 'DOJ EA Proposal', 'Downloaded_PDFs')
-    OUTPUT_DIR: str = os.path.join(os.path.expanduser('~'), 'Downloads', 'DOJ EA Proposal', 'Combined_Files')
+    # Home-relative paths are resolved per instance rather than at import time
+    DOWNLOAD_DIR: str = field(default_factory=lambda: os.path.join(
+        os.path.expanduser('~'), 'Downloads', 'DOJ EA Proposal', 'Downloaded_PDFs'))
+    OUTPUT_DIR: str = field(default_factory=lambda: os.path.join(
+        os.path.expanduser('~'), 'Downloads', 'DOJ EA Proposal', 'Combined_Files'))
     LOG_DIR: str = os.path.join(os.path.dirname(__file__), 'logs')
     PDF_PATTERN: str = r'.*\.pdf$'
-    WORD_LIMIT: int = 50000  # Maximum words per combined PDF
+    PAGE_LIMIT: int = 200  # Maximum pages per combined PDF
     CACHE_FILE: str = os.path.join(os.path.dirname(__file__), 'download_cache.json')
     FORCE_DOWNLOAD: bool = False
+    CACHE_MAX_AGE: int = 24 * 60 * 60  # Seconds before a cached file is revalidated
+    MAX_CONCURRENT_DOWNLOADS: int = 16  # Parallel download workers
+    USER_AGENT: str = 'pdf-combiner'
+    DOWNLOAD_CHUNK_SIZE: int = 64 * 1024  # Bytes per streamed write
 
 class PDFProcessor:
     """Handles PDF download, processing and combination operations."""
     
     def __init__(self, config: Config):
         self.config = config
+        self._pdf_pattern = re.compile(config.PDF_PATTERN, re.IGNORECASE)
         self.logger = setup_application_logging("pdf_combiner", config.LOG_DIR)
         self._validate_paths()
+        self.session = self._create_session()
+        self._cache = self._load_cache()
+        self._cache_lock = threading.Lock()
+        self._qpdf = shutil.which('qpdf')
+    
+    def _create_session(self) -> requests.Session:
+        """Create a pooled HTTP session so connections are reused across requests."""
+        session = requests.Session()
+        session.headers.update({'User-Agent': self.config.USER_AGENT})
+        adapter = HTTPAdapter(
+            pool_connections=1,  # All PDFs are served from a single host
+            pool_maxsize=32,
+            # Connection/read failures only; HTTP status retries (e.g. 5xx throttling) are left to
+            # the jittered backoff loop in _download_one so the two layers don't stack retries
+            max_retries=Retry(total=3, backoff_factor=1, backoff_jitter=1.0, backoff_max=30)
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def close(self) -> None:
+        """Persist the download cache and release pooled HTTP connections."""
+        self._save_cache()
+        self.session.close()
+    
+    def __enter__(self) -> 'PDFProcessor':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
     
     def _validate_paths(self) -> None:
         """Ensure all required paths exist and are writable."""
@@ -115,159 +180,306 @@ class PDFProcessor:
         """Retrieve PDF links from the memo page."""
         try:
             self.logger.info("Fetching PDF links from memo page...")
-            response = requests.get(self.config.MEMO_URL, timeout=30)
+            response = self.session.get(self.config.MEMO_URL, timeout=30)
             response.raise_for_status()
             
             self.logger.info("Parsing webpage content...")
-            soup = BeautifulSoup(response.content, 'html.parser')
-            links = soup.find_all('a', href=re.compile(self.config.PDF_PATTERN))
+            # lexbor selects anchors in C; only the href strings cross into Python
+            tree = LexborHTMLParser(response.content)
+            hrefs = (link.attributes.get('href') or '' for link in tree.css('a[href]'))
             
-            pdf_links = [self._get_absolute_url(link['href']) for link in links]
-            self.logger.info(f"Found {len(pdf_links)} PDF links")
+            # Match on the URL path so fragment variants like foo.pdf#page=2 are kept and
+            # collapse into foo.pdf; pages often link the same memo more than once, so dedupe
+            # while keeping page order
+            pdf_links = list(dict.fromkeys(
+                urldefrag(self._abs_url(self.config.BASE_URL, href))[0]
+                for href in hrefs if self._pdf_pattern.search(urlparse(href).path)
+            ))
+            self.logger.info("Found %d PDF links", len(pdf_links))
             return pdf_links
             
         except Exception as e:
-            self.logger.error(f"Error getting PDF links: {str(e)}")
+            self.logger.error("Error getting PDF links: %s", e)
             return []
 
-    def _get_absolute_url(self, relative_url: str) -> str:
-        """Convert relative URL to absolute URL."""
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _abs_url(base_url: str, relative_url: str) -> str:
+        """Convert relative URL to absolute URL against base_url."""
         if bool(urlparse(relative_url).netloc):
             return relative_url
-        return urljoin(self.config.BASE_URL, relative_url)
+        return urljoin(base_url, relative_url)
 
-    def _should_download(self, url: str, target_path: str) -> bool:
-        """Check if file should be downloaded."""
-        if self.config.FORCE_DOWNLOAD:
-            return True
-            
-        if not os.path.exists(target_path):
-            return True
-            
+    def _load_cache(self) -> Dict[str, Dict]:
+        """Load the download cache, returning an empty cache if missing or unreadable."""
+        cache_path = Path(self.config.CACHE_FILE)
+        if not cache_path.exists():
+            return {}
+        try:
+            return orjson.loads(cache_path.read_bytes())
+        except (OSError, ValueError) as e:
+            self.logger.warning("Ignoring unreadable cache %s: %s", cache_path, e)
+            return {}
+
+    def _save_cache(self) -> None:
+        """Persist the download cache atomically via a temporary file."""
+        tmp_path = f"{self.config.CACHE_FILE}.tmp"
         try:
-            response = requests.head(url, timeout=30)
-            remote_size = int(response.headers.get('content-length', 0))
-            local_size = os.path.getsize(target_path)
+            Path(tmp_path).write_bytes(orjson.dumps(self._cache))
+            os.replace(tmp_path, self.config.CACHE_FILE)
+        except OSError as e:
+            self.logger.warning("Could not write cache %s: %s", self.config.CACHE_FILE, e)
+
+    def _cached_entry(self, url: str, target_path: str) -> Optional[Dict]:
+        """Return the cache entry for url if the local file still matches its recorded size and mtime."""
+        if self.config.FORCE_DOWNLOAD or not os.path.exists(target_path):
+            return None
             
-            if remote_size != local_size:
-                return True
-                
-            self.logger.debug(f"Skipping existing file: {target_path}")
-            return False
+        entry = self._cache.get(url)
+        # The entry must describe this exact file; another URL may have written it since
+        if not entry or entry.get('path') != target_path:
+            return None
             
-        except Exception as e:
-            self.logger.warning(f"Error checking file {url}: {str(e)}")
-            return True
+        stat = os.stat(target_path)
+        if entry.get('size') != stat.st_size or entry.get('mtime') != stat.st_mtime:
+            return None
+        return entry
 
-    def download_pdfs(self, urls: List[str], max_retries: int = 3) -> Tuple[Dict[str, str], List[str]]:
+    def _record_download(self, url: str, entry: Dict) -> None:
+        """Store the cache entry for url, evicting entries of other URLs that claimed the same file."""
+        with self._cache_lock:
+            for other_url in [u for u, e in self._cache.items() if e.get('path') == entry['path']]:
+                del self._cache[other_url]
+            self._cache[url] = entry
+
+    def _conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """Build If-None-Match/If-Modified-Since headers from a cache entry."""
+        if not entry:
+            return {}
+            
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _local_path(self, url: str, disambiguate: bool = False) -> str:
         """
-        Download PDFs from provided URLs.
-        Returns tuple of (successful_downloads, failed_urls)
+        Map a URL to its download path, ignoring any query string or fragment.
+        With disambiguate, a short hash of the URL is added to the filename so
+        URLs that share a basename (e.g. /a.pdf and /x/a.pdf) get distinct files.
         """
-        downloaded_files = {}
-        failed_urls = []
-        
-        for url in urls:
-            retries = 0
-            while retries < max_retries:
-                try:
-                    filename = os.path.join(self.config.DOWNLOAD_DIR, os.path.basename(url))
+        digest = hashlib.md5(url.encode()).hexdigest()
+        name = os.path.basename(urlparse(url).path)
+        if not name:
+            name = f"{digest}.pdf"
+        elif disambiguate:
+            stem, ext = os.path.splitext(name)
+            name = f"{stem}_{digest[:8]}{ext}"
+        return os.path.join(self.config.DOWNLOAD_DIR, name)
+
+    def _local_paths(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Map each URL to a download path, disambiguating basenames shared by several URLs.
+        Basenames are compared case-insensitively, since A.pdf and a.pdf are the same
+        file on Windows and macOS.
+        """
+        plain_paths = {url: self._local_path(url) for url in urls}
+        name_counts = Counter(os.path.basename(path).casefold() for path in plain_paths.values())
+        return {
+            url: path if name_counts[os.path.basename(path).casefold()] == 1
+            else self._local_path(url, disambiguate=True)
+            for url, path in plain_paths.items()
+        }
+
+    def _download_one(self, url: str, filename: str, max_retries: int) -> Optional[str]:
+        """
+        Download a single PDF to filename, retrying on transient HTTP errors.
+        Returns the local file path, or None if the download failed.
+        """
+        retries = 0
+        while retries < max_retries:
+            try:
+                entry = self._cached_entry(url, filename)
+                if entry and time.time() - entry.get('checked', 0) < self.config.CACHE_MAX_AGE:
+                    self.logger.debug("Using cached file: %s", filename)
+                    return filename
                     
-                    if not self._should_download(url, filename):
-                        downloaded_files[url] = filename
-                        break
+                headers = self._conditional_headers(entry)
+                with self.session.get(url, headers=headers, timeout=30, stream=True) as response:
+                    if response.status_code == 304:
+                        entry['checked'] = time.time()
+                        self.logger.debug("Skipping unchanged file: %s", filename)
+                        return filename
                         
-                    response = requests.get(url, timeout=30)
-                    
                     if response.status_code == 404:
-                        self.logger.warning(f"File not found (404): {url}")
-                        failed_urls.append(url)
-                        break
+                        self.logger.warning("File not found (404): %s", url)
+                        return None
                         
                     response.raise_for_status()
                     
-                    with open(filename, 'wb') as f:
-                        f.write(response.content)
-                    downloaded_files[url] = filename
-                    self.logger.info(f"Downloaded: {url}")
-                    break
+                    # Stream to disk so memory use stays at one chunk per download. Writing to
+                    # a .part file means a failed transfer never truncates the existing copy.
+                    part_path = f"{filename}.part"
+                    try:
+                        with open(part_path, 'wb') as f:
+                            for chunk in response.iter_content(chunk_size=self.config.DOWNLOAD_CHUNK_SIZE):
+                                f.write(chunk)
+                        os.replace(part_path, filename)
+                    except Exception:
+                        if os.path.exists(part_path):
+                            os.remove(part_path)
+                        raise
+                            
+                    stat = os.stat(filename)
+                    self._record_download(url, {
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'size': stat.st_size,
+                        'mtime': stat.st_mtime,
+                        'checked': time.time(),
+                        'path': filename
+                    })
+                self.logger.debug("Downloaded: %s", url)
+                return filename
+                
+            except HTTPError as he:
+                if he.response.status_code == 404:
+                    self.logger.warning("File not found (404): %s", url)
+                    return None
+                retries += 1
+                if retries == max_retries:
+                    self.logger.error("Max retries reached for %s: %s", url, he)
+                    return None
+                # Exponential backoff with jitter so concurrent workers don't retry in lockstep
+                time.sleep(min(30, 2 ** retries + random.random()))
                     
-                except HTTPError as he:
-                    if he.response.status_code == 404:
-                        self.logger.warning(f"File not found (404): {url}")
-                        failed_urls.append(url)
-                        break
-                    retries += 1
-                    if retries == max_retries:
-                        self.logger.error(f"Max retries reached for {url}: {str(he)}")
-                        failed_urls.append(url)
-                    else:
-                        time.sleep(1)  # Wait before retry
-                        
-                except Exception as e:
-                    self.logger.error(f"Error downloading {url}: {str(e)}")
+            except Exception as e:
+                self.logger.error("Error downloading %s: %s", url, e)
+                return None
+                
+        return None
+
+    def download_pdfs(self, urls: List[str], max_retries: int = 3) -> Tuple[Dict[str, str], List[str]]:
+        """
+        Download PDFs from provided URLs concurrently.
+        Returns tuple of (successful_downloads, failed_urls)
+        """
+        downloaded_files = {}
+        failed_urls = []
+        
+        # Each worker must own exactly one target file: repeated URLs are fetched once, and
+        # _local_paths gives distinct URLs names that differ case-insensitively. Any URL whose
+        # file (compared case-insensitively, as on Windows/macOS) is already claimed is failed
+        # rather than letting two workers stream into the same file.
+        target_paths = {}
+        claimed_paths = set()
+        for url, path in self._local_paths(list(dict.fromkeys(urls))).items():
+            path_key = os.path.normcase(path).casefold()
+            if path_key in claimed_paths:
+                self.logger.warning("Skipping %s: download path %s is already in use", url, path)
+                failed_urls.append(url)
+                continue
+            claimed_paths.add(path_key)
+            target_paths[url] = path
+        urls = list(target_paths)
+        
+        with ThreadPoolExecutor(max_workers=self.config.MAX_CONCURRENT_DOWNLOADS) as executor:
+            results = executor.map(
+                self._download_one, urls, [target_paths[url] for url in urls], repeat(max_retries)
+            )
+            for url, filename in zip(urls, results):
+                if filename is None:
                     failed_urls.append(url)
-                    break
+                else:
+                    downloaded_files[url] = filename
                     
         return downloaded_files, failed_urls
 
-    def _count_words(self, pdf_reader: PdfReader) -> int:
-        """Count approximate words in a PDF."""
-        word_count = 0
-        for page in pdf_reader.pages:
-            text = page.extract_text()
-            words = text.split()
-            word_count += len(words)
-        return word_count
+    def _write_part(self, filepaths: List[str], output_path: str) -> None:
+        """
+        Concatenate PDFs into a single output file.
+        Uses qpdf when installed, which streams objects to disk instead of
+        holding the whole part in memory; falls back to PyPDF2 otherwise.
+        """
+        if self._qpdf:
+            result = subprocess.run(
+                [self._qpdf, '--empty', '--pages', *filepaths, '--', output_path],
+                capture_output=True, text=True
+            )
+            # Exit code 3 means qpdf succeeded but reported warnings
+            if result.stderr:
+                self.logger.warning("qpdf (exit %d) for %s: %s", result.returncode, output_path, result.stderr.strip())
+            if result.returncode not in (0, 3):
+                raise subprocess.CalledProcessError(
+                    result.returncode, result.args, result.stdout, result.stderr
+                )
+            return
+            
+        # Source handles stay open until write, since PyPDF2 resolves objects lazily
+        with ExitStack() as stack:
+            merger = PdfWriter()
+            for filepath in filepaths:
+                fh = stack.enter_context(open(filepath, 'rb'))
+                merger.append(PdfReader(fh, strict=False), import_outline=False)
+            with open(output_path, 'wb') as output_file:
+                merger.write(output_file)
 
     def combine_pdfs(self, downloaded_files: Dict[str, str]) -> List[str]:
-        """Combine downloaded PDFs into multiple files based on word limit."""
+        """Combine downloaded PDFs into multiple files based on page limit."""
         output_paths = []
-        current_merger = PdfWriter()
-        current_word_count = 0
-        file_counter = 1
+        parts = []
+        current_files = []
+        current_page_count = 0
+        
+        # One timestamp per run so all parts of a run share the same suffix
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         try:
-            for filepath in downloaded_files.values():
-                reader = PdfReader(filepath)
-                file_words = self._count_words(reader)
+            # Page counting is CPU-bound and independent per file, so fan it out across processes
+            filepaths = list(downloaded_files.values())
+            with ProcessPoolExecutor() as executor:
+                page_counts = list(executor.map(_count_pages, filepaths, chunksize=4))
                 
-                # If adding this file would exceed limit, save current and start new
-                if current_word_count + file_words > self.config.WORD_LIMIT and current_word_count > 0:
-                    output_path = os.path.join(
-                        self.config.OUTPUT_DIR,
-                        f'combined_memos_part{file_counter}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-                    )
-                    with open(output_path, 'wb') as output_file:
-                        current_merger.write(output_file)
-                    output_paths.append(output_path)
-                    self.logger.info(f"Created combined PDF part {file_counter} at: {output_path}")
+            for filepath, file_pages in zip(filepaths, page_counts):
+                # A file at or over the limit always becomes its own part
+                if file_pages >= self.config.PAGE_LIMIT:
+                    if current_files:
+                        parts.append(current_files)
+                        current_files = []
+                        current_page_count = 0
+                    parts.append([filepath])
+                    continue
                     
-                    # Reset for next file
-                    current_merger = PdfWriter()
-                    current_word_count = 0
-                    file_counter += 1
+                # If adding this file would exceed limit, close current part and start new
+                if current_page_count + file_pages > self.config.PAGE_LIMIT and current_files:
+                    parts.append(current_files)
+                    current_files = []
+                    current_page_count = 0
                 
-                # Add pages to current merger
-                for page in reader.pages:
-                    current_merger.add_page(page)
-                current_word_count += file_words
+                current_files.append(filepath)
+                current_page_count += file_pages
             
-            # Save final file if there's anything left
-            if current_word_count > 0:
+            if current_files:
+                parts.append(current_files)
+                
+            for file_counter, part_files in enumerate(parts, start=1):
                 output_path = os.path.join(
-                    self.config.OUTPUT_DIR,
-                    f'combined_memos_part{file_counter}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+                    self.config.OUTPUT_DIR, f'combined_memos_part{file_counter}_{timestamp}.pdf'
                 )
-                with open(output_path, 'wb') as output_file:
-                    current_merger.write(output_file)
+                if len(part_files) == 1:
+                    # A single source file needs no re-serialization
+                    shutil.copyfile(part_files[0], output_path)
+                else:
+                    self._write_part(part_files, output_path)
                 output_paths.append(output_path)
-                self.logger.info(f"Created final combined PDF part {file_counter} at: {output_path}")
+                self.logger.info("Created combined PDF part %d at: %s", file_counter, output_path)
             
             return output_paths
             
         except Exception as e:
-            self.logger.error(f"Error combining PDFs: {str(e)}")
+            self.logger.error("Error combining PDFs: %s", e)
             return []
 
 def main() -> None:
@@ -282,16 +494,17 @@ def main() -> None:
 
         downloaded_files, failed_urls = processor.download_pdfs(pdf_links)
         if failed_urls:
-            processor.logger.warning(f"Failed to download {len(failed_urls)} files")
+            processor.logger.warning("Failed to download %d files", len(failed_urls))
         
         if downloaded_files:
             output_paths = processor.combine_pdfs(downloaded_files)
             if output_paths:
-                processor.logger.info(f"Created {len(output_paths)} combined PDF files")
+                processor.logger.info("Created %d combined PDF files", len(output_paths))
     except Exception as e:
         processor.logger.exception("Fatal error in main application")
         raise
     finally:
+        processor.close()
         processor.logger.info("Application shutting down")
 
 if __name__ == "__main__":
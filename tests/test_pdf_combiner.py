@@ -0,0 +1,134 @@
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from PyPDF2 import PdfReader, PdfWriter
+
+_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'PDF Combiner.py')
+_spec = importlib.util.spec_from_file_location('pdf_combiner', _SCRIPT)
+pdf_combiner = importlib.util.module_from_spec(_spec)
+sys.modules['pdf_combiner'] = pdf_combiner
+_spec.loader.exec_module(pdf_combiner)
+
+
+class WritePartTest(unittest.TestCase):
+    """_write_part should produce the same page count through qpdf and the PyPDF2 fallback."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        config = pdf_combiner.Config(
+            DOWNLOAD_DIR=os.path.join(self.tmp, 'downloads'),
+            OUTPUT_DIR=os.path.join(self.tmp, 'output'),
+            LOG_DIR=os.path.join(self.tmp, 'logs'),
+            CACHE_FILE=os.path.join(self.tmp, 'cache.json')
+        )
+        self.processor = pdf_combiner.PDFProcessor(config)
+        self.addCleanup(self.processor.close)
+        self.sources = [self._make_pdf('a.pdf', 2), self._make_pdf('b.pdf', 3)]
+        self.output_path = os.path.join(self.tmp, 'combined.pdf')
+
+    def _make_pdf(self, name, pages):
+        path = os.path.join(self.tmp, name)
+        writer = PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(width=100, height=100)
+        with open(path, 'wb') as f:
+            writer.write(f)
+        return path
+
+    @unittest.skipUnless(shutil.which('qpdf'), 'qpdf is not installed')
+    def test_write_part_with_qpdf(self):
+        self.processor._write_part(self.sources, self.output_path)
+        self.assertEqual(len(PdfReader(self.output_path).pages), 5)
+
+    def test_write_part_without_qpdf(self):
+        self.processor._qpdf = None
+        self.processor._write_part(self.sources, self.output_path)
+        self.assertEqual(len(PdfReader(self.output_path).pages), 5)
+
+
+class CombinePdfsTest(unittest.TestCase):
+    """combine_pdfs should accept any legal OUTPUT_DIR, including ones with braces."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.output_dir = os.path.join(self.tmp, 'Proposal {draft}')
+        config = pdf_combiner.Config(
+            DOWNLOAD_DIR=os.path.join(self.tmp, 'downloads'),
+            OUTPUT_DIR=self.output_dir,
+            LOG_DIR=os.path.join(self.tmp, 'logs'),
+            CACHE_FILE=os.path.join(self.tmp, 'cache.json'),
+            PAGE_LIMIT=4
+        )
+        self.processor = pdf_combiner.PDFProcessor(config)
+        self.addCleanup(self.processor.close)
+        self.processor._qpdf = None
+
+    def _make_pdf(self, name, pages):
+        path = os.path.join(self.tmp, name)
+        writer = PdfWriter()
+        for _ in range(pages):
+            writer.add_blank_page(width=100, height=100)
+        with open(path, 'wb') as f:
+            writer.write(f)
+        return path
+
+    def test_combine_pdfs_with_braces_in_output_dir(self):
+        downloaded_files = {
+            'https://example.com/a.pdf': self._make_pdf('a.pdf', 2),
+            'https://example.com/b.pdf': self._make_pdf('b.pdf', 1),
+            'https://example.com/c.pdf': self._make_pdf('c.pdf', 3)
+        }
+        output_paths = self.processor.combine_pdfs(downloaded_files)
+        self.assertEqual(len(output_paths), 2)
+        for output_path in output_paths:
+            self.assertEqual(os.path.dirname(output_path), self.output_dir)
+        self.assertEqual([len(PdfReader(path).pages) for path in output_paths], [3, 3])
+
+
+class LocalPathsTest(unittest.TestCase):
+    """_local_paths should give every URL its own file, even on case-insensitive filesystems."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        config = pdf_combiner.Config(
+            DOWNLOAD_DIR=os.path.join(self.tmp, 'downloads'),
+            OUTPUT_DIR=os.path.join(self.tmp, 'output'),
+            LOG_DIR=os.path.join(self.tmp, 'logs'),
+            CACHE_FILE=os.path.join(self.tmp, 'cache.json')
+        )
+        self.processor = pdf_combiner.PDFProcessor(config)
+        self.addCleanup(self.processor.close)
+
+    def test_unique_basename_keeps_plain_name(self):
+        paths = self.processor._local_paths(['https://example.com/memos/m-21-01.pdf'])
+        self.assertEqual(os.path.basename(paths['https://example.com/memos/m-21-01.pdf']), 'm-21-01.pdf')
+
+    def test_basenames_differing_only_in_case_are_disambiguated(self):
+        urls = ['https://example.com/memos/A.pdf', 'https://example.com/archive/a.pdf']
+        paths = self.processor._local_paths(urls)
+        names = [os.path.basename(paths[url]).casefold() for url in urls]
+        self.assertNotIn('a.pdf', names)
+        self.assertEqual(len(set(names)), 2)
+
+    def test_download_pdfs_never_shares_a_target_file(self):
+        # Force a case-insensitive clash that _local_paths did not resolve
+        clashing = {
+            'https://example.com/memos/A.pdf': os.path.join(self.tmp, 'downloads', 'A.pdf'),
+            'https://example.com/archive/a.pdf': os.path.join(self.tmp, 'downloads', 'a.pdf')
+        }
+        self.processor._local_paths = lambda urls: clashing
+        self.processor._download_one = lambda url, filename, max_retries: filename
+        downloaded_files, failed_urls = self.processor.download_pdfs(list(clashing))
+        self.assertEqual(list(downloaded_files), ['https://example.com/memos/A.pdf'])
+        self.assertEqual(failed_urls, ['https://example.com/archive/a.pdf'])
+
+
+if __name__ == '__main__':
+    unittest.main()